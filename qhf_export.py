@@ -1,11 +1,32 @@
 # -*- coding: utf-8 -*-
 import struct
-import datetime
+import array
+import time
 import argparse
 import os
 import json
 import sys
 import logging
+import functools
+import concurrent.futures
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy is optional; decrypt_message falls back to a pure-Python loop.
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; write_json falls back to the standard json module.
+    orjson = None
+
+try:
+    from _qhf_decrypt import decrypt_into as _decrypt_into
+except ImportError:
+    # Optional C accelerator, built with `python setup.py build_ext --inplace`.
+    _decrypt_into = None
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 
@@ -22,19 +43,47 @@ MESSAGE_TYPE_MAP = {
     81: "QIP/ICQ service message (birthday)",
 }
 
+# >: Big-endian
+# 3s: Magic bytes (QHF)
+# B: Version (unsigned char)
+# I: File size (unsigned int)
+# 36s: Reserved/Unknown (skip for now)
+# H: UIN Length (unsigned short)
+_HEADER_STRUCT = struct.Struct('>3sBI36sH')
+
+# Message header, big-endian. Only the fields used are unpacked:
+# I: Timestamp (offset 0x12)
+# B: Direction flag, non-zero if outgoing (offset 0x1A)
+# B: Message type code (offset 0x1B)
+# I: Message body size (last 4 bytes)
+_MSG_HEADER_V2 = struct.Struct('>18xI4xBBxI')   # 0x21 bytes
+_MSG_HEADER_V3 = struct.Struct('>18xI4xBB3xI')  # 0x23 bytes
+
+@functools.lru_cache(maxsize=64)
+def _cached_struct(struct_format):
+    """Returns a compiled Struct for a variable-length header field format."""
+    return struct.Struct(struct_format)
+
+# Output files are written in many small pieces; buffer them in 1 MiB writes
+_OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Inserted by _decode_text for invalid UTF-8 sequences
+_REPLACEMENT_CHAR = '\ufffd'
+
+def _decode_text(raw):
+    """Decodes QHF string bytes as UTF-8, replacing invalid sequences.
+
+    Decoding in a single call avoids raising and catching UnicodeDecodeError
+    for every malformed string.
+    """
+    return raw.decode('utf-8', errors='replace')
+
 def parse_qhf_header(f):
     """Parses the header of a QHF file."""
     header_info = {}
     filename_for_log = os.path.basename(f.name) if hasattr(f, 'name') else 'Unknown File'
 
-    # >: Big-endian
-    # 3s: Magic bytes (QHF)
-    # B: Version (unsigned char)
-    # I: File size (unsigned int)
-    # 36s: Reserved/Unknown (skip for now)
-    # H: UIN Length (unsigned short)
-    header_struct_format = '>3sBI36sH'
-    header_size = struct.calcsize(header_struct_format)
+    header_size = _HEADER_STRUCT.size
     header_buf = f.read(header_size)
     if len(header_buf) < header_size:
         raise ValueError(f"[{filename_for_log}] File too small to contain QHF header.")
@@ -45,7 +94,7 @@ def parse_qhf_header(f):
         _fsz,
         _reserved,
         uin_len,
-    ) = struct.unpack(header_struct_format, header_buf)
+    ) = _HEADER_STRUCT.unpack(header_buf)
 
     if magicbytes != b'QHF':
         raise ValueError(f"[{filename_for_log}] Invalid magic bytes. Expected b'QHF', got {magicbytes!r}")
@@ -53,108 +102,116 @@ def parse_qhf_header(f):
     header_info['version'] = version
 
     uin_struct_format = f'>{uin_len}sH'
-    uin_struct_size = struct.calcsize(uin_struct_format)
+    uin_struct = _cached_struct(uin_struct_format)
+    uin_struct_size = uin_struct.size
     uin_buf = f.read(uin_struct_size)
     if len(uin_buf) < uin_struct_size:
         raise ValueError(f"[{filename_for_log}] Could not read UIN and Nick Length.")
 
-    (uin_bytes, nick_len) = struct.unpack(uin_struct_format, uin_buf)
-    try:
-        try:
-            header_info['uin'] = uin_bytes.decode('utf8')
-        except UnicodeDecodeError:
-            logging.warning(f"[{filename_for_log}] UIN decoding as UTF-8 failed, trying latin1.")
-            header_info['uin'] = uin_bytes.decode('latin1', errors='replace')
-    except Exception as e:
-         raise ValueError(f"[{filename_for_log}] Could not decode UIN: {e}")
+    (uin_bytes, nick_len) = uin_struct.unpack(uin_buf)
+    header_info['uin'] = _decode_text(uin_bytes)
+    if _REPLACEMENT_CHAR in header_info['uin']:
+        logging.warning(f"[{filename_for_log}] UIN is not valid UTF-8, invalid bytes replaced.")
 
     nick_struct_format = f'>{nick_len}s'
-    nick_struct_size = struct.calcsize(nick_struct_format)
+    nick_struct = _cached_struct(nick_struct_format)
+    nick_struct_size = nick_struct.size
     nick_buf = f.read(nick_struct_size)
     if len(nick_buf) < nick_struct_size:
          raise ValueError(f"[{filename_for_log}] Could not read Nickname.")
 
-    (nick_bytes,) = struct.unpack(nick_struct_format, nick_buf)
-    try:
-        try:
-            header_info['nickname'] = nick_bytes.decode('utf8')
-        except UnicodeDecodeError:
-            logging.warning(f"[{filename_for_log}] Nickname decoding as UTF-8 failed, trying latin1.")
-            header_info['nickname'] = nick_bytes.decode('latin1', errors='replace')
-    except Exception as e:
-         raise ValueError(f"[{filename_for_log}] Could not decode Nickname: {e}")
+    (nick_bytes,) = nick_struct.unpack(nick_buf)
+    header_info['nickname'] = _decode_text(nick_bytes)
+    if _REPLACEMENT_CHAR in header_info['nickname']:
+        logging.warning(f"[{filename_for_log}] Nickname is not valid UTF-8, invalid bytes replaced.")
 
     return header_info
 
+# Decryption key positions (1, 2, 3, ...) reduced mod 256. Grown on demand
+# and sliced per message, so the key stream is only built once.
+_KEY_POSITIONS = None
+
+def _key_positions(length):
+    """Returns a uint8 array of the first `length` key positions."""
+    global _KEY_POSITIONS
+    if _KEY_POSITIONS is None or len(_KEY_POSITIONS) < length:
+        size = max(length, 0x10000)
+        _KEY_POSITIONS = np.arange(1, size + 1, dtype=np.uint32).astype(np.uint8)
+    return _KEY_POSITIONS[:length]
+
 def decrypt_message(msg_bytes):
     """Decrypts the message bytes using the QHF XOR algorithm."""
-    return bytes(
-        map(
-            lambda val_pos: (val_pos[0] + val_pos[1]) & 0xFF ^ 0xFF,
-            zip(msg_bytes, range(1, len(msg_bytes) + 1)),
+    if not msg_bytes:
+        return b''
+    if _decrypt_into is not None:
+        buf = bytearray(msg_bytes)
+        _decrypt_into(buf, 1)
+        return bytes(buf)
+    if np is None:
+        return bytes(
+            map(
+                lambda val_pos: (val_pos[0] + val_pos[1]) & 0xFF ^ 0xFF,
+                zip(msg_bytes, range(1, len(msg_bytes) + 1)),
+            )
         )
-    )
-
-def parse_qhf_messages(f, header_info, filename_for_log):
-    """Parses messages from the QHF file stream."""
-    messages = []
-
-    username = header_info.get('nickname', 'Unknown Contact')
-    # Default to 2 if not found
-    version = header_info.get('version', 2)
-
-    # message header size
-    if version >= 3:
-        msg_header_size = 0x23
-    else:
-        msg_header_size = 0x21
+    # uint8 addition wraps mod 256, matching the `& 0xFF` above
+    buf = np.frombuffer(msg_bytes, dtype=np.uint8)
+    out = buf + _key_positions(len(buf))
+    out ^= 0xFF
+    return out.tobytes()
+
+def parse_qhf_message_data(data, msg_header_struct, filename_for_log):
+    """Parses the message blocks in `data` using the given header layout.
+
+    Messages are returned column-wise as a dict of parallel sequences
+    (timestamp_unix, is_outgoing, message_type_code, text) rather than one
+    dict per message.
+    """
+    timestamps = array.array('I')
+    outgoing_flags = bytearray()
+    type_codes = bytearray()
+    texts = []
+
+    msg_header_size = msg_header_struct.size
+    unpack_msg_header = msg_header_struct.unpack_from
+
+    data = memoryview(data)
+    data_len = len(data)
+    offset = 0
 
     msg_counter = 0
-    while True:
-        msg_header = f.read(msg_header_size)
-        if not msg_header:
-            break
-
-        if len(msg_header) < msg_header_size:
-            logging.warning(f"[{filename_for_log}] Incomplete message header found at end of file (read {len(msg_header)} bytes, expected {msg_header_size}). Stopping.")
+    while offset < data_len:
+        body_start = offset + msg_header_size
+        if body_start > data_len:
+            logging.warning(f"[{filename_for_log}] Incomplete message header found at end of file (read {data_len - offset} bytes, expected {msg_header_size}). Stopping.")
             break
 
         msg_counter += 1
         try:
-            msg_timestamp_unix = struct.unpack('>I', msg_header[18:22])[0]
-            is_outgoing = bool(msg_header[26])
-            message_type_code = msg_header[27]
-            msg_size_bytes = msg_header[-4:]
-            msg_size = struct.unpack('>I', msg_size_bytes)[0]
-
-            # Read/decrypt message body
-            msg_body_encrypted = f.read(msg_size)
-            if len(msg_body_encrypted) < msg_size:
-                logging.warning(f"[{filename_for_log}] Message {msg_counter}: Incomplete message body (read {len(msg_body_encrypted)} bytes, expected {msg_size}). Skipping message.")
+            msg_timestamp_unix, direction, message_type_code, msg_size = unpack_msg_header(data, offset)
+            is_outgoing = 1 if direction else 0
+            offset = body_start + msg_size
+
+            # Slice/decrypt message body
+            if offset > data_len:
+                logging.warning(f"[{filename_for_log}] Message {msg_counter}: Incomplete message body (read {data_len - body_start} bytes, expected {msg_size}). Skipping message.")
                 continue
+            if msg_size:
+                msg_body_encrypted = data[body_start:offset]
 
-            msg_body_decrypted = decrypt_message(msg_body_encrypted)
+                msg_body_decrypted = decrypt_message(msg_body_encrypted)
 
-            try:
-                message_text = msg_body_decrypted.decode('utf8')
-            except UnicodeDecodeError:
-                logging.warning(f"[{filename_for_log}] Message {msg_counter}: UTF-8 decoding failed, trying latin1.")
-                message_text = msg_body_decrypted.decode('latin1', errors='replace')
-
-            sender = 'Me' if is_outgoing else username
-            timestamp_dt = datetime.datetime.fromtimestamp(msg_timestamp_unix, tz=datetime.timezone.utc)
-            timestamp_iso = timestamp_dt.isoformat()
-            message_type_description = MESSAGE_TYPE_MAP.get(message_type_code, "Unknown")
-
-            messages.append({
-                "sender": sender,
-                "timestamp_unix": msg_timestamp_unix,
-                "timestamp_iso": timestamp_iso,
-                "is_outgoing": is_outgoing,
-                "message_type_code": message_type_code,
-                "message_type_description": message_type_description,
-                "text": message_text
-            })
+                message_text = _decode_text(msg_body_decrypted)
+                if _REPLACEMENT_CHAR in message_text:
+                    logging.warning(f"[{filename_for_log}] Message {msg_counter}: Text is not valid UTF-8, invalid bytes replaced.")
+            else:
+                # Service messages often have no body
+                message_text = ''
+
+            timestamps.append(msg_timestamp_unix)
+            outgoing_flags.append(is_outgoing)
+            type_codes.append(message_type_code)
+            texts.append(message_text)
 
         except struct.error as e:
             logging.error(f"[{filename_for_log}] Message {msg_counter}: Error unpacking message header/data: {e}. Skipping rest of file.")
@@ -163,18 +220,43 @@ def parse_qhf_messages(f, header_info, filename_for_log):
             logging.error(f"[{filename_for_log}] Message {msg_counter}: Unexpected error processing message: {e}. Skipping message.")
             continue
 
-    return messages
+    return {
+        "timestamp_unix": timestamps,
+        "is_outgoing": outgoing_flags,
+        "message_type_code": type_codes,
+        "text": texts,
+    }
+
+def parse_qhf_messages(f, header_info, filename_for_log):
+    """Parses messages from the QHF file stream."""
+    # Default to 2 if not found
+    version = header_info.get('version', 2)
+
+    # message header layout, chosen once per file
+    if version >= 3:
+        msg_header_struct = _MSG_HEADER_V3
+    else:
+        msg_header_struct = _MSG_HEADER_V2
+
+    # Read the rest of the file once and walk it by offset
+    return parse_qhf_message_data(f.read(), msg_header_struct, filename_for_log)
 
 def parse_qhf_file(infile_path):
-    """Reads a QHF file and returns header info and a list of message dictionaries."""
+    """Reads a QHF file and returns header info and the message columns."""
     logging.info(f"Processing file: {infile_path}")
     filename_for_log = os.path.basename(infile_path)
     try:
         with open(infile_path, 'rb') as f:
+            # The file is read front to back once; let the kernel read ahead
+            if hasattr(os, 'posix_fadvise'):
+                try:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                except OSError:
+                    pass  # Only a hint; e.g. not supported on pipes
             header_info = parse_qhf_header(f)
             messages = parse_qhf_messages(f, header_info, filename_for_log)
 
-        logging.info(f"Successfully parsed {len(messages)} messages from {infile_path}")
+        logging.info(f"Successfully parsed {len(messages['text'])} messages from {infile_path}")
         return header_info, messages
 
     except FileNotFoundError:
@@ -187,14 +269,189 @@ def parse_qhf_file(infile_path):
         logging.error(f"An unexpected error occurred while processing {infile_path}: {e}")
         return None, None
 
-def format_log_entry(name, timestamp_dt, message):
+def format_iso_timestamp(timestamp_unix):
+    """Formats a unix timestamp as an ISO 8601 UTC string.
+
+    Equivalent to datetime.fromtimestamp(ts, tz=utc).isoformat() for whole
+    seconds, without allocating a datetime per message.
+    """
+    return time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime(timestamp_unix))
+
+def iter_json_messages(header_info, messages):
+    """Yields one JSON-ready dict per message from the parsed message columns."""
+    # Indexed by the 0/1 is_outgoing flag
+    sender_names = (header_info.get('nickname', 'Unknown Contact'), "Me")
+    # Type codes are a single byte, so resolve every description up front
+    type_descriptions = tuple(MESSAGE_TYPE_MAP.get(code, "Unknown") for code in range(256))
+    for timestamp_unix, is_outgoing, message_type_code, text in zip(
+        messages['timestamp_unix'],
+        messages['is_outgoing'],
+        messages['message_type_code'],
+        messages['text'],
+    ):
+        yield {
+            "sender": sender_names[is_outgoing],
+            "timestamp_unix": timestamp_unix,
+            "timestamp_iso": format_iso_timestamp(timestamp_unix),
+            "is_outgoing": bool(is_outgoing),
+            "message_type_code": message_type_code,
+            "message_type_description": type_descriptions[message_type_code],
+            "text": text,
+        }
+
+class _LazyJSONList(list):
+    """A list stand-in whose items are generated while it is being encoded.
+
+    json's encoder only serializes real lists as arrays; overriding
+    __iter__ and __len__ lets iterencode pull message dicts one at a time
+    instead of materializing them all up front.
+    """
+
+    def __init__(self, factory, length):
+        super().__init__()
+        self._factory = factory
+        self._length = length
+
+    def __iter__(self):
+        return iter(self._factory())
+
+    def __len__(self):
+        return self._length
+
+def build_json_data(header_info, messages):
+    """Builds the JSON document for a parsed QHF file.
+
+    The message list is lazy and is only meant to be serialized by write_json.
+    """
+    return {
+        "uin": header_info.get('uin', 'N/A'),
+        "nickname": header_info.get('nickname', 'N/A'),
+        "messages": _LazyJSONList(
+            lambda: iter_json_messages(header_info, messages),
+            len(messages['text']),
+        ),
+    }
+
+def _orjson_default(obj):
+    """Materializes lazy message lists for orjson, which can't iterate them."""
+    if isinstance(obj, _LazyJSONList):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def write_json(f_out, json_data):
+    """Writes json_data to f_out.
+
+    With orjson installed the document is encoded in one call (indented by
+    2 spaces, the only indent orjson supports) and written as bytes.
+    Otherwise it is streamed chunk by chunk from json's iterencode.
+    """
+    if orjson is not None:
+        output = orjson.dumps(
+            json_data,
+            default=_orjson_default,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_SUBCLASS,
+        )
+        # Skip the text layer's encoding step when a binary buffer is available
+        f_out.flush()
+        f_out.buffer.write(output)
+        return
+
+    encoder = json.JSONEncoder(indent=4, ensure_ascii=False)
+    for chunk in encoder.iterencode(json_data):
+        f_out.write(chunk)
+
+# ':SS UTC' suffixes indexed by second of the minute
+_SECOND_SUFFIXES = tuple(f"{second:02d} UTC" for second in range(60))
+
+# [minute, 'YYYY-MM-DD HH:MM:' prefix] of the last formatted timestamp
+_last_minute_prefix = [None, '']
+
+def format_txt_timestamp(timestamp_unix):
+    """Formats a unix timestamp as 'YYYY-MM-DD HH:MM:SS UTC'.
+
+    Chat messages tend to come in bursts, so the strftime'd prefix of the
+    previous call is reused while the minute stays the same.
+    """
+    minute, second = divmod(timestamp_unix, 60)
+    if minute != _last_minute_prefix[0]:
+        _last_minute_prefix[0] = minute
+        _last_minute_prefix[1] = time.strftime('%Y-%m-%d %H:%M:', time.gmtime(timestamp_unix))
+    return _last_minute_prefix[1] + _SECOND_SUFFIXES[second]
+
+def format_log_entry(name, timestamp_unix, message):
     """Formats a single message entry for plain text output."""
-    timestamp_str = timestamp_dt.strftime('%Y-%m-%d %H:%M:%S %Z')
+    timestamp_str = format_txt_timestamp(timestamp_unix)
     return '\n'.join([
         f"{name} [{timestamp_str}]",
         message,
     ])
 
+def write_txt(f_out, header_info, messages):
+    """Writes the plain text log to f_out one entry at a time."""
+    # Indexed by the 0/1 is_outgoing flag
+    sender_names = (header_info.get('nickname', 'Unknown Contact'), "Me")
+    separator = ''
+    for timestamp_unix, is_outgoing, text in zip(
+        messages['timestamp_unix'], messages['is_outgoing'], messages['text']
+    ):
+        f_out.write(separator)
+        f_out.write(format_log_entry(sender_names[is_outgoing], timestamp_unix, text))
+        separator = '\n\n'
+
+def write_output(f_out, header_info, messages, output_format):
+    """Writes parsed QHF data to f_out in the requested format."""
+    if output_format == 'json':
+        write_json(f_out, build_json_data(header_info, messages))
+    elif output_format == 'txt':
+        write_txt(f_out, header_info, messages)
+
+def _prefetch_files(paths):
+    """Asks the kernel to start reading the given files into the page cache.
+
+    POSIX_FADV_WILLNEED starts readahead for each file so its pages are
+    likely cached by the time a worker opens it. The call issues the reads
+    itself and may block while the device queue is full, so callers should
+    only pass the few files that are about to be processed. Does nothing
+    where posix_fadvise is unavailable.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue  # parse_qhf_file reports unreadable files
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+def _convert_one(infile_path, outfile_path, output_format):
+    """Converts a single QHF file for directory mode. Returns True on success.
+
+    Kept at module level so it can be pickled for ProcessPoolExecutor.
+    """
+    header_info, messages = parse_qhf_file(infile_path)
+    if header_info is None or messages is None:
+        logging.error(f"Failed to process file: {infile_path}")
+        return False
+
+    try:
+        with open(outfile_path, 'w', encoding='utf-8', buffering=_OUTPUT_BUFFER_SIZE) as f_out:
+            write_output(f_out, header_info, messages, output_format)
+        logging.info(f"Successfully wrote {output_format.upper()} data to: {outfile_path}")
+        return True
+
+    except IOError as e:
+        logging.error(f"Could not write to output file {outfile_path}: {e}")
+    except TypeError as e:
+        logging.error(f"Error serializing data to JSON for {outfile_path}: {e}")
+    except Exception as e:
+        logging.error(f"An unexpected error occurred while processing/writing {outfile_path}: {e}")
+    return False
+
 def main():
     parser = argparse.ArgumentParser(
         prog='qhf_converter.py',
@@ -250,30 +507,6 @@ def main():
         header_info, messages = parse_qhf_file(input_path)
 
         if header_info is not None and messages is not None:
-            output_content = ""
-            if output_format == 'json':
-                json_data = {
-                    "uin": header_info.get('uin', 'N/A'),
-                    "nickname": header_info.get('nickname', 'N/A'),
-                    "messages": messages
-                }
-                try:
-                    output_content = json.dumps(json_data, indent=4, ensure_ascii=False)
-                except TypeError as e:
-                    logging.error(f"Error serializing data to JSON for {input_path}: {e}")
-                    sys.exit(1)
-
-            elif output_format == 'txt':
-                formatted_entries = []
-                contact_name = header_info.get('nickname', 'Unknown Contact')
-                for msg in messages:
-                    sender_name = "Me" if msg['is_outgoing'] else contact_name
-                    timestamp_dt = datetime.datetime.fromisoformat(msg['timestamp_iso'])
-                    formatted_entries.append(
-                        format_log_entry(sender_name, timestamp_dt, msg['text'])
-                    )
-                output_content = '\n\n'.join(formatted_entries)
-
             # Write output
             if output_path:
                 output_dir_path = os.path.dirname(output_path)
@@ -285,17 +518,21 @@ def main():
                          logging.error(f"Could not create output directory {output_dir_path}: {e}")
                          sys.exit(1)
                 try:
-                    with open(output_path, 'w', encoding='utf-8') as f_out:
-                        f_out.write(output_content)
+                    with open(output_path, 'w', encoding='utf-8', buffering=_OUTPUT_BUFFER_SIZE) as f_out:
+                        write_output(f_out, header_info, messages, output_format)
                     logging.info(f"Successfully wrote {output_format.upper()} data to: {output_path}")
                 except IOError as e:
                     logging.error(f"Could not write to output file {output_path}: {e}")
                     sys.exit(1)
+                except TypeError as e:
+                    logging.error(f"Error serializing data to JSON for {input_path}: {e}")
+                    sys.exit(1)
                 except Exception as e:
                     logging.error(f"An unexpected error occurred writing file {output_path}: {e}")
                     sys.exit(1)
             else:
-                print(output_content)
+                write_output(sys.stdout, header_info, messages, output_format)
+                sys.stdout.write('\n')
         else:
             logging.error(f"Failed to process file: {input_path}")
             sys.exit(1)
@@ -319,59 +556,42 @@ def main():
              logging.error(f"Specified output path '{output_dir}' exists but is not a directory.")
              sys.exit(1)
 
-        file_count = 0
-        success_count = 0
-        failure_count = 0
-
-        for filename in os.listdir(input_path):
-            if filename.lower().endswith('.qhf'):
-                file_count += 1
-                infile_path = os.path.join(input_path, filename)
-                header_info, messages = parse_qhf_file(infile_path)
-
-                if header_info is not None and messages is not None:
-                    output_content = ""
-                    output_extension = f".{output_format}"
-                    base_filename = os.path.splitext(filename)[0]
-                    outfile_path = os.path.join(output_dir, f"{base_filename}{output_extension}")
-
-                    try:
-                        if output_format == 'json':
-                            json_data = {
-                                "uin": header_info.get('uin', 'N/A'),
-                                "nickname": header_info.get('nickname', 'N/A'),
-                                "messages": messages
-                            }
-                            output_content = json.dumps(json_data, indent=4, ensure_ascii=False)
-
-                        elif output_format == 'txt':
-                            formatted_entries = []
-                            contact_name = header_info.get('nickname', 'Unknown Contact')
-                            for msg in messages:
-                                sender_name = "Me" if msg['is_outgoing'] else contact_name
-                                timestamp_dt = datetime.datetime.fromisoformat(msg['timestamp_iso'])
-                                formatted_entries.append(
-                                    format_log_entry(sender_name, timestamp_dt, msg['text'])
-                                )
-                            output_content = '\n\n'.join(formatted_entries)
-
-                        with open(outfile_path, 'w', encoding='utf-8') as f_out:
-                            f_out.write(output_content)
-                        logging.info(f"Successfully wrote {output_format.upper()} data to: {outfile_path}")
-                        success_count += 1
-
-                    except IOError as e:
-                        logging.error(f"Could not write to output file {outfile_path}: {e}")
-                        failure_count += 1
-                    except TypeError as e:
-                         logging.error(f"Error serializing data to JSON for {outfile_path}: {e}")
-                         failure_count += 1
-                    except Exception as e:
-                         logging.error(f"An unexpected error occurred while processing/writing {outfile_path}: {e}")
-                         failure_count += 1
-                else:
-                    logging.error(f"Failed to process file: {infile_path}")
-                    failure_count += 1
+        infile_paths = []
+        outfile_paths = []
+        output_extension = f".{output_format}"
+        with os.scandir(input_path) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith('.qhf') and entry.is_file():
+                    base_filename = os.path.splitext(entry.name)[0]
+                    infile_paths.append(entry.path)
+                    outfile_paths.append(os.path.join(output_dir, f"{base_filename}{output_extension}"))
+
+        # Workers take files in submission order. Keep readahead a window of
+        # files ahead of them, so prefetched pages are not evicted before use
+        # when the directory is larger than the page cache.
+        max_workers = os.cpu_count() or 1
+        prefetch_window = 2 * max_workers
+        _prefetch_files(infile_paths[:prefetch_window])
+        next_prefetch = prefetch_window
+
+        # Files are independent, so convert them in parallel worker processes
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=logging.getLogger().setLevel,
+            initargs=(logging.getLogger().level,),
+        ) as executor:
+            futures = [
+                executor.submit(_convert_one, infile_path, outfile_path, output_format)
+                for infile_path, outfile_path in zip(infile_paths, outfile_paths)
+            ]
+            for _ in concurrent.futures.as_completed(futures):
+                _prefetch_files(infile_paths[next_prefetch:next_prefetch + 1])
+                next_prefetch += 1
+            results = [future.result() for future in futures]
+
+        file_count = len(results)
+        success_count = sum(results)
+        failure_count = file_count - success_count
 
         logging.info(f"--- Directory Processing Summary ---")
         logging.info(f"Output format: {output_format.upper()}")
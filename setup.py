@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+# Builds the optional C accelerator used by qhf_export.py:
+#
+#     python setup.py build_ext --inplace
+#
+# The script works without it, falling back to NumPy or pure Python.
+from setuptools import setup, Extension
+
+setup(
+    name='qhf-export',
+    py_modules=['qhf_export'],
+    ext_modules=[
+        Extension('_qhf_decrypt', sources=['_qhf_decrypt.c'], optional=True),
+    ],
+)